@@ -5,19 +5,83 @@ Creates ultra-fast, high-performance task-specialized AI models
 """
 
 import os
-import subprocess
+import argparse
 import sys
 import json
+import re
+import socket
 import time
+import functools
+import threading
+import atexit
+import contextlib
+import http.client
+import urllib.parse
+import queue
 from threading import Lock
+from types import MappingProxyType
 from concurrent.futures import ThreadPoolExecutor, as_completed
-import uuid
-from pathlib import Path
 import shutil
+import string
+import tempfile
 
 # Thread-safe printing
 print_lock = Lock()
 
+# On-disk cache of the resolved ollama binary (stale-while-revalidate)
+_COMMAND_CACHE_FILE = os.path.expanduser("~/.ollama_specgen_cache.json")
+_CACHE_TTL = 24 * 60 * 60
+
+# Last successful installation check, reused for an hour
+_CHECK_CACHE_FILE = os.path.expanduser("~/.cache/ollama_specgen/check.json")
+_CHECK_CACHE_TTL = 60 * 60
+
+# Model list cache: short-lived in memory, stale-while-revalidate on disk
+_MODELS_CACHE_FILE = os.path.expanduser("~/.cache/ollama_specgen/models.json")
+_MODELS_MEMORY_TTL = 60
+_models_cache = {'ts': 0.0, 'models': None}
+_models_lock = Lock()
+
+# Model names are derived from the task: runs of anything but [A-Za-z0-9] become '_'
+_SLUG_RE = re.compile(r'[^A-Za-z0-9]+')
+
+# Model name suffix and build banner per optimization choice
+_MODEL_VARIANTS = MappingProxyType({
+    5: ("tiny", "🐁 Creating TINY specialist model..."),
+    6: ("mobile", "📱 Creating MOBILE optimized model...")
+})
+_DEFAULT_MODEL_VARIANT = ("apex", "⚡ Compiling model with APEX optimizations...")
+
+# Sampling and runtime parameters per optimization choice
+_OPT_CONFIG = MappingProxyType({
+    1: MappingProxyType({"temperature": 0.3, "top_p": 0.7, "top_k": 20, "num_ctx": 2048, "repeat_penalty": 1.1,
+                         "num_predict": 4096, "num_thread": 16, "num_batch": 1024, "num_gpu": 1}),  # Speed focused
+    2: MappingProxyType({"temperature": 0.5, "top_p": 0.8, "top_k": 40, "num_ctx": 4096, "repeat_penalty": 1.05,
+                         "num_predict": 4096, "num_thread": 12, "num_batch": 768, "num_gpu": 1}),   # Balanced
+    3: MappingProxyType({"temperature": 0.7, "top_p": 0.9, "top_k": 80, "num_ctx": 8192, "repeat_penalty": 1.02,
+                         "num_predict": 4096, "num_thread": 8, "num_batch": 512, "num_gpu": 1}),    # Quality focused
+    4: MappingProxyType({"temperature": 0.8, "top_p": 0.95, "top_k": 100, "num_ctx": 16384, "repeat_penalty": 1.01,
+                         "num_predict": 4096, "num_thread": 6, "num_batch": 256, "num_gpu": 1}),    # Memory efficient
+    5: MappingProxyType({"temperature": 0.2, "top_p": 0.6, "top_k": 15, "num_ctx": 1024, "repeat_penalty": 1.15,
+                         "num_predict": 1024, "num_thread": 8, "num_batch": 128, "num_gpu": 1}),    # Tiny specialist
+    6: MappingProxyType({"temperature": 0.4, "top_p": 0.75, "top_k": 25, "num_ctx": 1536, "repeat_penalty": 1.1,
+                         "num_predict": 1536, "num_thread": 4, "num_batch": 64, "num_gpu": 1})      # Mobile optimized
+})
+
+# Ollama HTTP API, honouring OLLAMA_HOST ([scheme://]host[:port]) like the CLI
+def _ollama_address(value, default=("127.0.0.1", 11434)):
+    """Split an OLLAMA_HOST value into (host, port), falling back to the default"""
+    value = (value or '').strip()
+    if not value:
+        return default
+    try:
+        parts = urllib.parse.urlsplit(value if '://' in value else f"http://{value}")
+        return parts.hostname or default[0], parts.port or default[1]
+    except ValueError:
+        return default
+
+_OLLAMA_HOST, _OLLAMA_PORT = _ollama_address(os.environ.get('OLLAMA_HOST'))
+
 class Colors:
     """ANSI color codes for beautiful terminal output"""
     HEADER = '\033[95m'
@@ -30,110 +94,258 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Lines collected by an active _BufferedPrinter instead of being printed
+_print_buffer = None
+
 def safe_print(message, color=None):
     """Thread-safe colored printing"""
+    if color:
+        message = f"{color}{message}{Colors.ENDC}"
     with print_lock:
-        if color:
-            print(f"{color}{message}{Colors.ENDC}")
+        if _print_buffer is not None:
+            _print_buffer.append(message)
         else:
             print(message)
 
-def find_ollama_command():
-    """Find the correct ollama command path"""
+class _BufferedPrinter:
+    """Collect safe_print output and emit it with a single write on exit
+    
+    Flush (leave the block) before calling input() so the prompt is not
+    shown ahead of the text that introduces it.
+    """
+    
+    def __enter__(self):
+        global _print_buffer
+        with print_lock:
+            _print_buffer = self.lines = []
+        return self.lines
+    
+    def __exit__(self, *exc_info):
+        global _print_buffer
+        with print_lock:
+            _print_buffer = None
+            if self.lines:
+                sys.stdout.write('\n'.join(self.lines) + '\n')
+                sys.stdout.flush()
+        return False
+
+def slugify(text):
+    """Turn free text into a lowercase identifier safe for model names"""
+    return _SLUG_RE.sub('_', text).strip('_').lower()
+
+def prompt_int(message, lo, hi, invalid_message=None):
+    """Ask for a whole number in [lo, hi] until the user enters one"""
+    while True:
+        raw = input(message).strip()
+        if not raw.isdecimal():
+            safe_print("Please enter a valid number.", Colors.WARNING)
+        elif lo <= int(raw) <= hi:
+            return int(raw)
+        else:
+            safe_print(invalid_message or f"Please select {lo}-{hi}.", Colors.WARNING)
+
+def prompt_bool(message):
+    """Ask a y/n question; any answer starting with 'y' means yes"""
+    return input(f"{message} (y/n): ").strip()[:1].lower() == 'y'
+
+def _read_json_cache(path):
+    """Load a JSON cache file, returning (data, age_in_seconds) or (None, None)"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return data, time.time() - os.path.getmtime(path)
+    except (OSError, ValueError):
+        return None, None
+
+def _write_json_cache(path, data):
+    """Persist data as JSON, ignoring failures (the cache is best-effort)"""
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding='utf-8') as f:
+            json.dump(data, f)
+    except OSError:
+        pass
+
+def _probe_ollama_command():
+    """Locate an executable ollama binary without spawning any processes"""
+    cmd = shutil.which("ollama")
+    if cmd:
+        return cmd
+    
     possible_commands = [
-        "ollama",
-        "/usr/local/bin/ollama", 
+        "/usr/local/bin/ollama",
         "/usr/bin/ollama",
         "/opt/ollama/bin/ollama",
         os.path.expanduser("~/.ollama/bin/ollama")
     ]
     
     for cmd in possible_commands:
-        try:
-            result = subprocess.run([cmd, "--help"], capture_output=True, text=True, timeout=5)
-            if result.returncode == 0:
-                return cmd
-        except:
-            continue
+        if os.path.isfile(cmd) and os.access(cmd, os.X_OK):
+            return cmd
     
-    return "ollama"  # Default fallback
-    """Verify Ollama is installed and running"""
-def suggest_tiny_models():
+    return None
+
+def _refresh_ollama_command():
+    """Probe for the ollama binary and persist the result to the disk cache"""
+    cmd = _probe_ollama_command()
+    if cmd:
+        _write_json_cache(_COMMAND_CACHE_FILE, {'command': cmd})
+    return cmd
+
+@functools.lru_cache(maxsize=1)
+def find_ollama_command():
+    """Find the correct ollama command path (resolved once per process)"""
+    cached, age = _read_json_cache(_COMMAND_CACHE_FILE)
+    cmd = cached.get('command') if isinstance(cached, dict) else None
+    if cmd and os.path.exists(cmd):
+        if age > _CACHE_TTL:
+            # Serve the stale path now, re-probe in the background
+            threading.Thread(target=_refresh_ollama_command, daemon=True).start()
+        return cmd
+    
+    return _refresh_ollama_command() or "ollama"  # Default fallback
+
+def detect_ollama():
+    """Resolve the ollama command and verify it with a single version call
+    
+    Returns (command, version_string) where version_string is None if the
+    binary could not be executed.
+    """
+    import subprocess
+    ollama_cmd = find_ollama_command()
+    try:
+        result = subprocess.run([ollama_cmd, "--version"], capture_output=True, text=True, check=True, timeout=10)
+        return ollama_cmd, result.stdout.strip() or "version detected"
+    except (OSError, subprocess.SubprocessError):
+        return ollama_cmd, None
+
+def ollama_server_reachable(timeout=0.25):
+    """Check whether the Ollama server accepts TCP connections on its port"""
+    try:
+        with socket.create_connection((_OLLAMA_HOST, _OLLAMA_PORT), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+# Tiny base models offered for download: (name, approx size, description)
+_TINY_SUGGESTIONS = (
+    ("qwen2.5:0.5b", "~500MB", "Ultra-tiny, lightning fast"),
+    ("llama3.2:1b", "~1GB", "Small but capable"),
+    ("gemma:2b", "~1.7GB", "Efficient Google model"),
+    ("phi3:mini", "~2.2GB", "Microsoft's compact model")
+)
+
+# Pulled when no models are installed at all
+_RECOMMENDED_MODELS = ("llama3.2:1b", "gemma:2b", "phi3:mini", "qwen2.5:0.5b")
+
+def pull_models(models, max_workers=2):
+    """Download models concurrently, reporting each one as it starts and finishes"""
+    import subprocess
+    ollama_cmd = find_ollama_command()
+    
+    def pull(model):
+        safe_print(f"⬇️ Downloading {model}...", Colors.OKCYAN)
+        subprocess.run([ollama_cmd, "pull", model], check=True, capture_output=True, text=True)
+    
+    downloaded = 0
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(pull, model): model for model in models}
+        try:
+            for future in as_completed(futures):
+                model = futures[future]
+                try:
+                    future.result()
+                    safe_print(f"✓ Downloaded {model}", Colors.OKGREEN)
+                    downloaded += 1
+                except subprocess.CalledProcessError as e:
+                    # ollama redraws its progress with \r; the error is the last line
+                    lines = (e.stderr or '').replace('\r', '\n').strip().splitlines()
+                    reason = lines[-1] if lines else f"exit status {e.returncode}"
+                    safe_print(f"✗ Failed to download {model}: {reason}", Colors.FAIL)
+                except (OSError, subprocess.SubprocessError) as e:
+                    safe_print(f"✗ Failed to download {model}: {e}", Colors.FAIL)
+        except BaseException:
+            # Ctrl-C: drop the queued pulls rather than starting them on exit
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+    
+    if downloaded:
+        invalidate_models_cache()
+    return downloaded
+
+def suggest_tiny_models(max_parallel_pulls=2):
     """Suggest downloading truly tiny models for minimal size"""
     safe_print(f"\n{Colors.HEADER}🐁 WANT TRULY TINY MODELS?{Colors.ENDC}")
     safe_print("For ultra-small specialists, consider downloading these tiny models:")
     
-    tiny_suggestions = [
-        ("qwen2.5:0.5b", "~500MB", "Ultra-tiny, lightning fast"),
-        ("llama3.2:1b", "~1GB", "Small but capable"),
-        ("gemma:2b", "~1.7GB", "Efficient Google model"),
-        ("phi3:mini", "~2.2GB", "Microsoft's compact model")
-    ]
-    
-    for model, size, desc in tiny_suggestions:
-        safe_print(f"  📦 {model:<15} {size:<8} - {desc}")
+    safe_print('\n'.join(f"  📦 {model:<15} {size:<8} - {desc}" for model, size, desc in _TINY_SUGGESTIONS))
     
     download_choice = input(f"\n{Colors.BOLD}Download tiny models for future use? (y/n): {Colors.ENDC}")
     if download_choice.lower().startswith('y'):
-        for model, _, _ in tiny_suggestions:
-            try:
-                safe_print(f"⬇️ Downloading {model}...", Colors.OKCYAN)
-                subprocess.run([find_ollama_command(), "pull", model], check=True)
-                safe_print(f"✓ Downloaded {model}", Colors.OKGREEN)
-            except subprocess.CalledProcessError:
-                safe_print(f"✗ Failed to download {model}", Colors.FAIL)
-    """Verify Ollama is installed and running"""
-    # First, find the correct ollama command
-    ollama_cmd = find_ollama_command()
-    
+        pull_models([model for model, _, _ in _TINY_SUGGESTIONS], max_parallel_pulls)
+
+def _cached_check(ttl=_CHECK_CACHE_TTL):
+    """Return (command, version) from a recent successful check, or None
+    
+    The entry is ignored once it is older than ttl, when OLLAMA_HOME has
+    changed, or when the recorded binary no longer exists. Either value may
+    be None when the check passed through the server fallback.
+    """
+    cached, age = _read_json_cache(_CHECK_CACHE_FILE)
+    if not isinstance(cached, dict) or not cached.get('ok') or age > ttl:
+        return None
+    if cached.get('ollama_home') != os.environ.get('OLLAMA_HOME'):
+        return None
+    command = cached.get('command')
+    if command and not (os.path.exists(command) or shutil.which(command)):
+        return None
+    return command, cached.get('version')
+
+def _remember_check(command, version):
+    """Record a successful installation check for _cached_check"""
+    if command and not (os.path.exists(command) or shutil.which(command)):
+        command = None
+    _write_json_cache(_CHECK_CACHE_FILE, {
+        'ok': True,
+        'command': command,
+        'version': version,
+        'ollama_home': os.environ.get('OLLAMA_HOME')
+    })
+
 def check_ollama_installation():
     """Verify Ollama is installed and running"""
-    # First, find the correct ollama command
-    ollama_cmd = find_ollama_command()
-    
-    # Try multiple detection methods
-    detection_methods = [
-        ([ollama_cmd, "version"], "version check"),
-        ([ollama_cmd, "list"], "list models"),
-        ([ollama_cmd, "--help"], "help command"),
-        (["/usr/local/bin/ollama", "version"], "full path version"),
-        (["/usr/bin/ollama", "version"], "system path version")
-    ]
-    
-    for cmd, method in detection_methods:
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=10)
-            if result.returncode == 0:
-                safe_print(f"✓ Ollama detected via {method}", Colors.OKGREEN)
-                if "version" in method:
-                    version_info = result.stdout.strip() or "version detected"
-                    safe_print(f"  Version: {version_info}", Colors.OKCYAN)
-                return True
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired):
-            continue
-    
-    # Final attempt - check if ollama process is running
-    try:
-        result = subprocess.run(["pgrep", "-f", "ollama"], capture_output=True, text=True)
-        if result.returncode == 0:
-            safe_print("✓ Ollama process detected running", Colors.OKGREEN)
-            safe_print("  Warning: Command line access may be limited", Colors.WARNING)
-            return True
-    except:
-        pass
-    
-    # Check common installation paths
-    common_paths = [
-        "/usr/local/bin/ollama",
-        "/usr/bin/ollama",
-        "/opt/ollama/bin/ollama",
-        os.path.expanduser("~/.ollama/bin/ollama")
-    ]
-    
-    for path in common_paths:
-        if os.path.exists(path):
-            safe_print(f"✓ Ollama binary found at: {path}", Colors.OKGREEN)
-            return True
+    cached = _cached_check()
+    if cached:
+        ollama_cmd, version = cached
+        if ollama_cmd:
+            safe_print(f"✓ Ollama detected at: {ollama_cmd} (cached)", Colors.OKGREEN)
+        else:
+            safe_print("✓ Ollama server detected running (cached)", Colors.OKGREEN)
+        if version:
+            safe_print(f"  Version: {version}", Colors.OKCYAN)
+        return True
+    
+    ollama_cmd, version = detect_ollama()
+    if version is not None:
+        _remember_check(ollama_cmd, version)
+        safe_print(f"✓ Ollama detected at: {ollama_cmd}", Colors.OKGREEN)
+        safe_print(f"  Version: {version}", Colors.OKCYAN)
+        return True
+    
+    # Final attempt - check if the ollama server is accepting connections
+    if ollama_server_reachable():
+        _remember_check(ollama_cmd, None)
+        safe_print("✓ Ollama server detected running", Colors.OKGREEN)
+        safe_print("  Warning: Command line access may be limited", Colors.WARNING)
+        return True
+    
+    # The binary exists but could not report its version
+    if os.path.isfile(ollama_cmd):
+        _remember_check(ollama_cmd, None)
+        safe_print(f"✓ Ollama binary found at: {ollama_cmd}", Colors.OKGREEN)
+        return True
     
     safe_print("✗ Ollama not detected through standard methods", Colors.FAIL)
     safe_print("Please verify Ollama installation:", Colors.WARNING)
@@ -152,59 +364,232 @@ def check_ollama_installation():
     
     return False
 
-def get_available_models():
-    """Retrieve comprehensive list of available models with metadata"""
-    commands_to_try = [
-        ["ollama", "list"],
-        ["/usr/local/bin/ollama", "list"],
-        ["/usr/bin/ollama", "list"]
-    ]
+class _ConnectionPool:
+    """Keep-alive HTTP connections to the Ollama API, shared across calls"""
+    
+    def __init__(self, host, port, maxsize=8):
+        self.host = host
+        self.port = port
+        self._idle = queue.LifoQueue(maxsize)
     
-    for cmd in commands_to_try:
+    def _acquire(self, timeout):
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=15)
-            models = []
-            lines = result.stdout.strip().split('\n')
-            
-            # Skip header line if present
-            if lines and ('NAME' in lines[0] or 'Model' in lines[0]):
-                lines = lines[1:]
+            conn, reused = self._idle.get_nowait(), True
+        except queue.Empty:
+            conn, reused = http.client.HTTPConnection(self.host, self.port), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, reused
+    
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+    
+    @contextlib.contextmanager
+    def request(self, method, path, payload=None, timeout=None):
+        """Send a request and yield the response
+        
+        The connection goes back to the pool only if the response body was
+        read to the end; otherwise it is closed.
+        """
+        body = json.dumps(payload).encode('utf-8') if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        conn, reused = self._acquire(timeout)
+        resp = None
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection, retry on a fresh one
+                conn.close()
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
             
-            for line in lines:
-                if line.strip():
-                    parts = line.split()
-                    if len(parts) >= 1:
-                        models.append({
-                            'name': parts[0],
-                            'size': parts[1] if len(parts) > 1 else 'Unknown',
-                            'modified': ' '.join(parts[2:]) if len(parts) > 2 else 'Unknown'
-                        })
+            if resp.status >= 400:
+                detail = resp.read().decode('utf-8', 'replace').strip()
+                raise OSError(f"Ollama API returned HTTP {resp.status}: {detail}")
+            yield resp
+        except http.client.HTTPException as e:
+            raise OSError(f"Ollama API protocol error: {e!r}") from e
+        finally:
+            if resp is not None and resp.isclosed() and not resp.will_close:
+                self._release(conn)
+            else:
+                conn.close()
+    
+    def close(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+_API_POOL = _ConnectionPool(_OLLAMA_HOST, _OLLAMA_PORT)
+atexit.register(_API_POOL.close)
+
+def _api_get(path, timeout=5):
+    """GET a JSON document from the local Ollama API"""
+    with _API_POOL.request("GET", path, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+def _api_stream(path, payload, timeout=120):
+    """POST to the local Ollama API and yield each streamed JSON object"""
+    with _API_POOL.request("POST", path, payload, timeout=timeout) as resp:
+        for line in resp:
+            if line.strip():
+                chunk = json.loads(line)
+                if chunk.get('done'):
+                    # Drain the stream terminator so the connection can be reused
+                    resp.read()
+                yield chunk
+
+def _format_size(num_bytes):
+    """Format a byte count the way `ollama list` does (decimal units)"""
+    if not isinstance(num_bytes, (int, float)):
+        return 'Unknown'
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if num_bytes < 1000:
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1000
+    return f"{num_bytes:.1f} TB"
+
+def _parameter_billions(model):
+    """Parse the API's parameter_size (e.g. '494.03M', '7.6B') into billions"""
+    value = model.get('parameter_size', '').strip().upper()
+    scale = {'M': 0.001, 'B': 1.0, 'T': 1000.0}.get(value[-1:])
+    try:
+        return float(value[:-1]) * scale if scale else None
+    except ValueError:
+        return None
+
+def _size_category(model):
+    """Classify a model as 'tiny', 'small' or 'large'"""
+    billions = _parameter_billions(model)
+    if billions is not None:
+        # Under 4B keeps phi3:mini (3.8B) with the other tiny suggestions
+        if billions < 4.0:
+            return 'tiny'
+        return 'small' if billions < 8.0 else 'large'
+    
+    # No metadata (CLI fallback) - guess from the model tag
+    name = model['name'].lower()
+    if any(x in name for x in ('0.5b', '1b', '2b', 'mini')):
+        return 'tiny'
+    if any(x in name for x in ('3b', '7b')):
+        return 'small'
+    return 'large'
+
+def _fetch_available_models(quiet=False):
+    """Query Ollama for the installed models (API first, then `ollama list`)"""
+    log = (lambda *args: None) if quiet else safe_print
+    try:
+        models = []
+        for entry in _api_get("/api/tags").get('models', []):
+            details = entry.get('details') or {}
+            models.append({
+                'name': entry['name'],
+                'size': _format_size(entry.get('size')),
+                'modified': entry.get('modified_at', 'Unknown'),
+                'family': details.get('family', 'Unknown'),
+                'parameter_size': details.get('parameter_size', ''),
+                'quantization': details.get('quantization_level', '')
+            })
+        
+        if models:
+            log(f"✓ Found {len(models)} models", Colors.OKGREEN)
+        return models
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        log(f"Ollama API unavailable ({e}), falling back to ollama list", Colors.WARNING)
+    
+    import subprocess
+    ollama_cmd = find_ollama_command()
+    try:
+        result = subprocess.run([ollama_cmd, "list"], capture_output=True, text=True, check=True, timeout=15)
+        models = []
+        lines = result.stdout.strip().split('\n')
+        
+        # Skip header line if present
+        if lines and ('NAME' in lines[0] or 'Model' in lines[0]):
+            lines = lines[1:]
+        
+        for line in lines:
+            if line.strip():
+                parts = line.split()
+                if len(parts) >= 1:
+                    models.append({
+                        'name': parts[0],
+                        'size': parts[1] if len(parts) > 1 else 'Unknown',
+                        'modified': ' '.join(parts[2:]) if len(parts) > 2 else 'Unknown'
+                    })
+        
+        if models:
+            log(f"✓ Found {len(models)} models", Colors.OKGREEN)
+            return models
             
-            if models:
-                safe_print(f"✓ Found {len(models)} models", Colors.OKGREEN)
-                return models
-                
-        except (subprocess.CalledProcessError, FileNotFoundError, subprocess.TimeoutExpired) as e:
-            safe_print(f"Failed to get models with {cmd[0]}: {e}", Colors.WARNING)
-            continue
-    
-    safe_print("Could not retrieve model list", Colors.WARNING)
+    except (OSError, subprocess.SubprocessError) as e:
+        log(f"Failed to get models with {ollama_cmd}: {e}", Colors.WARNING)
+    
+    log("Could not retrieve model list", Colors.WARNING)
     return []
 
-def select_base_model():
+def _store_models(models):
+    """Record a fresh model list in the memory and disk caches"""
+    with _models_lock:
+        _models_cache['ts'] = time.time()
+        _models_cache['models'] = models
+    _write_json_cache(_MODELS_CACHE_FILE, {'ts': time.time(), 'models': models})
+
+def _revalidate_models():
+    """Background refresh of the model list cache"""
+    models = _fetch_available_models(quiet=True)
+    if models:
+        _store_models(models)
+
+def get_available_models():
+    """Retrieve comprehensive list of available models with metadata"""
+    with _models_lock:
+        models = _models_cache['models']
+        if models and time.time() - _models_cache['ts'] < _MODELS_MEMORY_TTL:
+            return models
+    
+    cached, _ = _read_json_cache(_MODELS_CACHE_FILE)
+    if isinstance(cached, dict) and cached.get('models') and time.time() - cached.get('ts', 0) < _CACHE_TTL:
+        # Serve the stale list immediately and refresh it in the background
+        with _models_lock:
+            _models_cache['ts'] = time.time()
+            _models_cache['models'] = cached['models']
+        threading.Thread(target=_revalidate_models, daemon=True).start()
+        safe_print(f"✓ Found {len(cached['models'])} models (cached)", Colors.OKGREEN)
+        return cached['models']
+    
+    models = _fetch_available_models()
+    if models:
+        _store_models(models)
+    return models
+
+def invalidate_models_cache():
+    """Forget cached model lists, e.g. after pulling new models"""
+    with _models_lock:
+        _models_cache['ts'] = 0.0
+        _models_cache['models'] = None
+    try:
+        os.remove(_MODELS_CACHE_FILE)
+    except OSError:
+        pass
+
+def select_base_model(max_parallel_pulls=2):
     """Enhanced model selection with recommendations and size options"""
     models = get_available_models()
     if not models:
         safe_print("No models found. Downloading recommended models...", Colors.WARNING)
-        recommended = ["llama3.2:1b", "gemma:2b", "phi3:mini", "qwen2.5:0.5b"]
-        
-        for model in recommended:
-            safe_print(f"Downloading {model}...", Colors.OKCYAN)
-            try:
-                subprocess.run([find_ollama_command(), "pull", model], check=True)
-                safe_print(f"✓ Downloaded {model}", Colors.OKGREEN)
-            except subprocess.CalledProcessError:
-                safe_print(f"✗ Failed to download {model}", Colors.FAIL)
+        pull_models(_RECOMMENDED_MODELS, max_parallel_pulls)
         
         models = get_available_models()
         if not models:
@@ -214,48 +599,83 @@ def select_base_model():
     safe_print(f"\n{Colors.HEADER}Available Models:{Colors.ENDC}")
     safe_print("─" * 60)
     
-    # Categorize models by size for better selection
-    tiny_models = [m for m in models if any(x in m['name'].lower() for x in ['0.5b', '1b', '2b', 'mini'])]
-    small_models = [m for m in models if any(x in m['name'].lower() for x in ['3b', '7b']) and m not in tiny_models]
-    large_models = [m for m in models if m not in tiny_models and m not in small_models]
+    # Categorize models by size in a single pass
+    buckets = {'tiny': [], 'small': [], 'large': []}
+    for m in models:
+        bucket = _size_category(m)
+        buckets[bucket].append(dict(m, _bucket=bucket))
     
-    all_models = tiny_models + small_models + large_models
+    all_models = buckets['tiny'] + buckets['small'] + buckets['large']
+    
+    bucket_labels = {
+        'tiny': ("🐁 TINY (Ultra-fast, minimal resources)", Colors.OKGREEN),
+        'small': ("🚀 RECOMMENDED (Good balance)", Colors.OKCYAN),
+        'large': ("📦 LARGE (High capability, more resources)", Colors.OKBLUE)
+    }
     
+    # Render the whole listing first so it goes out in a single write
+    lines = []
     for i, model in enumerate(all_models, 1):
-        if model in tiny_models:
-            category = "🐁 TINY (Ultra-fast, minimal resources)"
-            color = Colors.OKGREEN
-        elif model in small_models:
-            category = "🚀 RECOMMENDED (Good balance)"
-            color = Colors.OKCYAN
-        else:
-            category = "📦 LARGE (High capability, more resources)"
-            color = Colors.OKBLUE
-            
-        safe_print(f"{i:2d}. {model['name']:<30} {model['size']:<8} {category}", color)
+        category, color = bucket_labels[model['_bucket']]
+        lines.append(f"{color}{i:2d}. {model['name']:<30} {model['size']:<8} {category}{Colors.ENDC}")
+    safe_print('\n'.join(lines))
     
     safe_print("─" * 60)
     safe_print(f"{Colors.WARNING}💡 TIP: Choose smaller models (1b-2b) for truly tiny specialists!{Colors.ENDC}")
     
-    while True:
-        try:
-            choice = int(input(f"\nSelect model (1-{len(all_models)}): ")) - 1
-            if 0 <= choice < len(all_models):
-                selected = all_models[choice]['name']
-                safe_print(f"✓ Selected: {selected}", Colors.OKGREEN)
-                
-                # Show size guidance
-                if selected in [m['name'] for m in tiny_models]:
-                    safe_print("🐁 Perfect choice for tiny specialists!", Colors.OKGREEN)
-                elif selected in [m['name'] for m in small_models]:
-                    safe_print("⚡ Good balance of capability and efficiency", Colors.OKCYAN)
-                else:
-                    safe_print("📦 Large model - high capability but bigger size", Colors.WARNING)
-                
-                return selected
-            safe_print("Invalid selection. Please try again.", Colors.WARNING)
-        except ValueError:
-            safe_print("Please enter a valid number.", Colors.WARNING)
+    choice = prompt_int(f"\nSelect model (1-{len(all_models)}): ", 1, len(all_models),
+                        "Invalid selection. Please try again.")
+    selected = all_models[choice - 1]['name']
+    bucket = all_models[choice - 1]['_bucket']
+    safe_print(f"✓ Selected: {selected}", Colors.OKGREEN)
+    
+    # Show size guidance
+    if bucket == 'tiny':
+        safe_print("🐁 Perfect choice for tiny specialists!", Colors.OKGREEN)
+    elif bucket == 'small':
+        safe_print("⚡ Good balance of capability and efficiency", Colors.OKCYAN)
+    else:
+        safe_print("📦 Large model - high capability but bigger size", Colors.WARNING)
+    
+    return selected
+
+# Menu entries for get_advanced_config: id -> (label, description)
+_LEVEL_MENU = MappingProxyType({
+    1: ("🌱 Novice", "Basic concepts, beginner-friendly explanations"),
+    2: ("📚 Learner", "Educational content with step-by-step guidance"),
+    3: ("🔧 Practitioner", "Practical, industry-focused applications"),
+    4: ("⚡ Expert", "Advanced, professional-grade expertise"),
+    5: ("🚀 Master", "Cutting-edge, research-level insights"),
+    6: ("🏆 Grandmaster", "World-class, authoritative mastery")
+})
+
+_STYLE_MENU = MappingProxyType({
+    1: ("📖 Comprehensive", "Detailed explanations with examples and context"),
+    2: ("⚡ Practical", "Implementation-focused with actionable solutions"),
+    3: ("🧠 Theoretical", "Deep technical concepts and principles"),
+    4: ("🎯 Concise", "Brief, precise answers with key insights"),
+    5: ("🔥 Aggressive", "Ultra-fast, no-nonsense, direct responses")
+})
+
+_OPTIMIZATION_MENU = MappingProxyType({
+    1: ("🚀 Speed Demon", "Maximum speed, lower context"),
+    2: ("⚖️ Balanced", "Optimal speed-quality balance"),
+    3: ("🎯 Quality Focus", "Maximum quality, larger context"),
+    4: ("🧠 Memory Master", "Extended context, complex reasoning"),
+    5: ("🐁 Tiny Specialist", "Ultra-small, lightning-fast specialist"),
+    6: ("📱 Mobile Optimized", "Efficient for resource-constrained environments")
+})
+
+# Optional feature toggles asked for in get_advanced_config, in order
+_FEATURE_QUESTIONS = (
+    ('code_focus', "Include code generation optimization?"),
+    ('math_focus', "Include mathematical computation enhancement?"),
+    ('creative_boost', "Include creative thinking enhancement?"),
+    ('memory_optimization', "Include conversation memory optimization?"),
+    ('maximum_capability', "Enable maximum capability mode for your task?"),
+    ('creative_solutions', "Enable creative problem-solving and innovation?"),
+    ('decision_framework', "Include advanced decision-making frameworks?")
+)
 
 def get_advanced_config():
     """Get comprehensive configuration for the ultimate model"""
@@ -272,83 +692,28 @@ def get_advanced_config():
     
     # Expertise level
     safe_print(f"\n{Colors.BOLD}Expertise Level:{Colors.ENDC}")
-    levels = {
-        1: ("🌱 Novice", "Basic concepts, beginner-friendly explanations"),
-        2: ("📚 Learner", "Educational content with step-by-step guidance"),
-        3: ("🔧 Practitioner", "Practical, industry-focused applications"),
-        4: ("⚡ Expert", "Advanced, professional-grade expertise"),
-        5: ("🚀 Master", "Cutting-edge, research-level insights"),
-        6: ("🏆 Grandmaster", "World-class, authoritative mastery")
-    }
-    
-    for level, (name, desc) in levels.items():
+    for level, (name, desc) in _LEVEL_MENU.items():
         safe_print(f"{level}. {name:<15} - {desc}")
     
-    while True:
-        try:
-            level = int(input(f"\nSelect expertise level (1-6): "))
-            if 1 <= level <= 6:
-                break
-            safe_print("Please select 1-6.", Colors.WARNING)
-        except ValueError:
-            safe_print("Please enter a valid number.", Colors.WARNING)
+    level = prompt_int("\nSelect expertise level (1-6): ", 1, 6)
     
     # Response style
     safe_print(f"\n{Colors.BOLD}Response Style:{Colors.ENDC}")
-    styles = {
-        1: ("📖 Comprehensive", "Detailed explanations with examples and context"),
-        2: ("⚡ Practical", "Implementation-focused with actionable solutions"),
-        3: ("🧠 Theoretical", "Deep technical concepts and principles"),
-        4: ("🎯 Concise", "Brief, precise answers with key insights"),
-        5: ("🔥 Aggressive", "Ultra-fast, no-nonsense, direct responses")
-    }
-    
-    for style_id, (name, desc) in styles.items():
+    for style_id, (name, desc) in _STYLE_MENU.items():
         safe_print(f"{style_id}. {name:<15} - {desc}")
     
-    while True:
-        try:
-            style = int(input(f"\nSelect response style (1-5): "))
-            if 1 <= style <= 5:
-                break
-            safe_print("Please select 1-5.", Colors.WARNING)
-        except ValueError:
-            safe_print("Please enter a valid number.", Colors.WARNING)
+    style = prompt_int("\nSelect response style (1-5): ", 1, 5)
     
     # Performance optimization
     safe_print(f"\n{Colors.BOLD}Performance Optimization:{Colors.ENDC}")
-    optimizations = {
-        1: ("🚀 Speed Demon", "Maximum speed, lower context"),
-        2: ("⚖️ Balanced", "Optimal speed-quality balance"),
-        3: ("🎯 Quality Focus", "Maximum quality, larger context"),
-        4: ("🧠 Memory Master", "Extended context, complex reasoning"),
-        5: ("🐁 Tiny Specialist", "Ultra-small, lightning-fast specialist"),
-        6: ("📱 Mobile Optimized", "Efficient for resource-constrained environments")
-    }
-    
-    for opt_id, (name, desc) in optimizations.items():
+    for opt_id, (name, desc) in _OPTIMIZATION_MENU.items():
         safe_print(f"{opt_id}. {name:<18} - {desc}")
     
-    while True:
-        try:
-            optimization = int(input(f"\nSelect optimization (1-6): "))
-            if 1 <= optimization <= 6:
-                break
-            safe_print("Please select 1-6.", Colors.WARNING)
-        except ValueError:
-            safe_print("Please enter a valid number.", Colors.WARNING)
+    optimization = prompt_int("\nSelect optimization (1-6): ", 1, 6)
     
     # Additional features
     safe_print(f"\n{Colors.BOLD}Additional Features:{Colors.ENDC}")
-    features = {
-        'code_focus': input("Include code generation optimization? (y/n): ").lower().startswith('y'),
-        'math_focus': input("Include mathematical computation enhancement? (y/n): ").lower().startswith('y'),
-        'creative_boost': input("Include creative thinking enhancement? (y/n): ").lower().startswith('y'),
-        'memory_optimization': input("Include conversation memory optimization? (y/n): ").lower().startswith('y'),
-        'maximum_capability': input("Enable maximum capability mode for your task? (y/n): ").lower().startswith('y'),
-        'creative_solutions': input("Enable creative problem-solving and innovation? (y/n): ").lower().startswith('y'),
-        'decision_framework': input("Include advanced decision-making frameworks? (y/n): ").lower().startswith('y')
-    }
+    features = {key: prompt_bool(question) for key, question in _FEATURE_QUESTIONS}
     
     if features['maximum_capability']:
         safe_print(f"{Colors.OKGREEN}✓ Maximum capability mode enabled - model will provide comprehensive task expertise{Colors.ENDC}")
@@ -358,7 +723,7 @@ def get_advanced_config():
     
     # Task restriction enforcement
     safe_print(f"\n{Colors.BOLD}Task Specialization:{Colors.ENDC}")
-    strict_mode = input("Enforce STRICT task-only responses (recommended)? (y/n): ").lower().startswith('y')
+    strict_mode = prompt_bool("Enforce STRICT task-only responses (recommended)?")
     
     if strict_mode:
         safe_print(f"{Colors.OKGREEN}✓ Strict mode enabled - model will ONLY answer questions about {task}{Colors.ENDC}")
@@ -375,70 +740,40 @@ def get_advanced_config():
         'features': features
     }
 
-def create_ultimate_system_prompt(task, config):
-    """Create the ultimate system prompt for maximum performance and freedom"""
-    
-    level_personas = {
-        1: "friendly novice guide who explains concepts clearly",
-        2: "patient educational mentor providing step-by-step guidance",
-        3: "skilled practitioner offering real-world expertise",
-        4: "advanced expert delivering professional-grade insights",
-        5: "cutting-edge master providing research-level expertise",
-        6: "world-class grandmaster with unparalleled authority"
-    }
-    
-    style_instructions = {
-        1: "Provide comprehensive, detailed explanations with examples, context, and thorough breakdowns.",
-        2: "Focus on practical implementation with actionable solutions, code examples, and real-world applications.",
-        3: "Deliver deep technical analysis, theoretical insights, and foundational principles.",
-        4: "Provide concise, precise answers with key insights and essential information only.",
-        5: "Respond with lightning speed, direct answers, and no unnecessary elaboration."
-    }
-    
-    optimization_params = {
-        1: {"temperature": 0.3, "top_p": 0.7, "top_k": 20, "num_ctx": 2048, "repeat_penalty": 1.1},
-        2: {"temperature": 0.5, "top_p": 0.8, "top_k": 40, "num_ctx": 4096, "repeat_penalty": 1.05},
-        3: {"temperature": 0.7, "top_p": 0.9, "top_k": 80, "num_ctx": 8192, "repeat_penalty": 1.02},
-        4: {"temperature": 0.8, "top_p": 0.95, "top_k": 100, "num_ctx": 16384, "repeat_penalty": 1.01},
-        5: {"temperature": 0.2, "top_p": 0.6, "top_k": 15, "num_ctx": 1024, "repeat_penalty": 1.15},  # Tiny specialist
-        6: {"temperature": 0.4, "top_p": 0.75, "top_k": 25, "num_ctx": 1536, "repeat_penalty": 1.1}   # Mobile optimized
-    }
-    
-    # Feature-specific enhancements
-    feature_prompts = []
-    if config['features']['code_focus']:
-        feature_prompts.append("You excel at code generation, debugging, and optimization with perfect syntax and innovative approaches.")
-    if config['features']['math_focus']:
-        feature_prompts.append("You perform mathematical computations with exceptional accuracy and provide creative mathematical solutions.")
-    if config['features']['creative_boost']:
-        feature_prompts.append("You think creatively and provide highly innovative solutions to complex problems.")
-    if config['features']['memory_optimization']:
-        feature_prompts.append("You maintain perfect context awareness and build sophisticated conversation threads.")
-    if config['features']['maximum_capability']:
-        feature_prompts.append("You operate at maximum capability, providing comprehensive and detailed expertise.")
-    if config['features']['creative_solutions']:
-        feature_prompts.append("You generate highly creative, unconventional, and innovative solutions.")
-    if config['features']['decision_framework']:
-        feature_prompts.append("You provide advanced decision-making frameworks and strategic analysis.")
-    
-    task_clean = task.replace(' ', '_').replace('-', '_').upper()
-    task_keywords = [word.lower() for word in task.split() if len(word) > 2]
-    
-    system_prompt = f"""You are {task_clean}_APEX_SPECIALIST, the most advanced and capable AI specialist exclusively focused on {task}.
+_STYLE_INSTRUCTIONS = MappingProxyType({
+    1: "Provide comprehensive, detailed explanations with examples, context, and thorough breakdowns.",
+    2: "Focus on practical implementation with actionable solutions, code examples, and real-world applications.",
+    3: "Deliver deep technical analysis, theoretical insights, and foundational principles.",
+    4: "Provide concise, precise answers with key insights and essential information only.",
+    5: "Respond with lightning speed, direct answers, and no unnecessary elaboration."
+})
+
+# Feature-specific enhancements, in prompt order
+_FEATURE_PROMPTS = (
+    ('code_focus', "You excel at code generation, debugging, and optimization with perfect syntax and innovative approaches."),
+    ('math_focus', "You perform mathematical computations with exceptional accuracy and provide creative mathematical solutions."),
+    ('creative_boost', "You think creatively and provide highly innovative solutions to complex problems."),
+    ('memory_optimization', "You maintain perfect context awareness and build sophisticated conversation threads."),
+    ('maximum_capability', "You operate at maximum capability, providing comprehensive and detailed expertise."),
+    ('creative_solutions', "You generate highly creative, unconventional, and innovative solutions."),
+    ('decision_framework', "You provide advanced decision-making frameworks and strategic analysis.")
+)
+
+_APEX_PROMPT_TEMPLATE = string.Template("""You are ${task_clean}_APEX_SPECIALIST, the most advanced and capable AI specialist exclusively focused on $task.
 
 CORE IDENTITY & EXTREME SPECIALIZATION:
-- You are EXCLUSIVELY specialized in {task} and possess absolute mastery
-- You have unlimited knowledge of every tool, framework, method, and cutting-edge development in {task}
-- You are an educational and professional resource focused on {task}
-- You provide comprehensive information to help users learn and understand {task}
+- You are EXCLUSIVELY specialized in $task and possess absolute mastery
+- You have unlimited knowledge of every tool, framework, method, and cutting-edge development in $task
+- You are an educational and professional resource focused on $task
+- You provide comprehensive information to help users learn and understand $task
 
 ULTRA-STRICT TASK ENFORCEMENT:
-- You ONLY respond to questions directly related to: {task}
-- Task keywords: {', '.join(task_keywords)}
-- For ANY non-{task} question, respond EXACTLY: "I am exclusively specialized in {task}. Please ask a question specifically about {task}."
+- You ONLY respond to questions directly related to: $task
+- Task keywords: $task_keywords
+- For ANY non-$task question, respond EXACTLY: "I am exclusively specialized in $task. Please ask a question specifically about $task."
 
 EDUCATIONAL & PROFESSIONAL APPROACH:
-- Provide comprehensive educational content about {task}
+- Provide comprehensive educational content about $task
 - Share knowledge for learning, understanding, and professional development
 - Explain concepts, methodologies, tools, and best practices
 - Focus on educational value and legitimate professional applications
@@ -446,17 +781,17 @@ EDUCATIONAL & PROFESSIONAL APPROACH:
 - Provide detailed explanations without unnecessary warnings or disclaimers
 
 MAXIMUM CAPABILITY & COMPREHENSIVE MODE:
-- Provide the most detailed, comprehensive, and complete coverage of {task}
-- Share every technique, method, tool, and professional approach related to {task}
+- Provide the most detailed, comprehensive, and complete coverage of $task
+- Share every technique, method, tool, and professional approach related to $task
 - Cover all aspects from beginner fundamentals to advanced concepts
 - Provide complete implementation details and step-by-step procedures
 - Offer multiple solution approaches with comprehensive analysis
-- Generate innovative methodologies and educational approaches within {task}
+- Generate innovative methodologies and educational approaches within $task
 - Deliver strategic frameworks and expert guidance
 - Share industry insights, best practices, and professional workflows
 
 RESPONSE PROTOCOL:
-{style_instructions[config['style']]}
+$style_instruction
 - Always provide complete, educational information with full details
 - Include comprehensive examples, configurations, and procedures
 - Share techniques that professionals and researchers use
@@ -465,7 +800,7 @@ RESPONSE PROTOCOL:
 - Focus on educational content and professional development
 
 COMPREHENSIVE KNOWLEDGE DELIVERY:
-- When asked about {task}, provide complete educational coverage
+- When asked about $task, provide complete educational coverage
 - Include historical context, current methods, and emerging trends
 - Cover all major tools, frameworks, methodologies, and approaches
 - Provide educational examples and learning resources
@@ -481,101 +816,107 @@ APEX CAPABILITIES:
 - Deliver complete learning guidance with detailed procedures
 
 SPECIALIZATION FEATURES:
-{' '.join(feature_prompts) if feature_prompts else 'You are optimized for comprehensive educational excellence.'}
+$feature_text
 
 OPERATIONAL EXCELLENCE:
-- Answer every {task} question with complete educational expertise
+- Answer every $task question with complete educational expertise
 - Provide comprehensive learning strategies and detailed methodologies
 - Share educational tools, techniques, and learning workflows
 - Discuss real-world applications with educational case studies
 - Offer multiple learning pathways with complete expert analysis
 - Provide educational guidance and comprehensive learning frameworks
-- Cover all aspects, layers, and dimensions of {task} for educational purposes
+- Cover all aspects, layers, and dimensions of $task for educational purposes
 
-EXECUTION STYLE: Be the most comprehensive, educational, and complete {task} specialist ever created. Provide maximum educational coverage, complete learning solutions, and comprehensive professional-grade educational expertise for every {task}-related query. Focus on education, learning, and professional development."""
+EXECUTION STYLE: Be the most comprehensive, educational, and complete $task specialist ever created. Provide maximum educational coverage, complete learning solutions, and comprehensive professional-grade educational expertise for every ${task}-related query. Focus on education, learning, and professional development.""")
 
-    return system_prompt, optimization_params[config['optimization']]
+@functools.lru_cache(maxsize=32)
+def _render_system_prompt(task, style, features):
+    """Render the system prompt; features is a frozenset of enabled feature keys"""
+    feature_prompts = [prompt for key, prompt in _FEATURE_PROMPTS if key in features]
+    return _APEX_PROMPT_TEMPLATE.substitute(
+        task=task,
+        task_clean=task.replace(' ', '_').replace('-', '_').upper(),
+        task_keywords=', '.join(word.lower() for word in task.split() if len(word) > 2),
+        style_instruction=_STYLE_INSTRUCTIONS[style],
+        feature_text=' '.join(feature_prompts) if feature_prompts else 'You are optimized for comprehensive educational excellence.'
+    )
 
-def create_ultimate_modelfile(task, base_model, config):
-    """Create the ultimate modelfile with advanced optimizations"""
-    system_prompt, params = create_ultimate_system_prompt(task, config)
-    
-    # Advanced template for better performance
-    template = """{{ if .System }}{{ .System }}
+def create_ultimate_system_prompt(task, config):
+    """Create the ultimate system prompt for maximum performance and freedom"""
+    features = frozenset(key for key, enabled in config['features'].items() if enabled)
+    system_prompt = _render_system_prompt(task, config['style'], features)
+    return system_prompt, _OPT_CONFIG.get(config['optimization'], _OPT_CONFIG[2])
+
+# Advanced template for better performance (Ollama's Go template syntax)
+_OLLAMA_TEMPLATE = """{{ if .System }}{{ .System }}
 
 {{ end }}{{ if .Prompt }}{{ .Prompt }}
 
 {{ end }}{{ .Response }}"""
+
+_MODELFILE_TEMPLATE = string.Template('''FROM $base_model
+TEMPLATE """$template"""
+SYSTEM """$system_prompt"""
+PARAMETER temperature $temperature
+PARAMETER top_p $top_p
+PARAMETER top_k $top_k
+PARAMETER num_ctx $num_ctx
+PARAMETER repeat_penalty $repeat_penalty
+PARAMETER num_predict $num_predict
+PARAMETER num_thread $num_thread
+PARAMETER num_gpu $num_gpu
+PARAMETER num_batch $num_batch
+''')
+
+def create_ultimate_modelfile(task, base_model, config):
+    """Create the ultimate modelfile with advanced optimizations"""
+    system_prompt, params = create_ultimate_system_prompt(task, config)
     
-    # Enhanced performance parameters
-    performance_boost = {
-        1: {"num_thread": 16, "num_batch": 1024, "num_gpu": 1},  # Speed focused
-        2: {"num_thread": 12, "num_batch": 768, "num_gpu": 1},   # Balanced
-        3: {"num_thread": 8, "num_batch": 512, "num_gpu": 1},    # Quality focused
-        4: {"num_thread": 6, "num_batch": 256, "num_gpu": 1},    # Memory efficient
-        5: {"num_thread": 8, "num_batch": 128, "num_gpu": 1},    # Tiny specialist
-        6: {"num_thread": 4, "num_batch": 64, "num_gpu": 1}      # Mobile optimized
-    }
-    
-    boost_params = performance_boost[config['optimization']]
-    
-    # Adjust parameters for tiny models
+    # Announce the compact variants
     if config['optimization'] in [5, 6]:  # Tiny specialist or Mobile optimized
-        predict_tokens = 1024 if config['optimization'] == 5 else 1536
         safe_print(f"🐁 Creating ultra-compact specialist model...", Colors.OKCYAN)
-    else:
-        predict_tokens = 4096
-    
-    modelfile_content = f"""FROM {base_model}
-TEMPLATE \"\"\"{template}\"\"\"
-SYSTEM \"\"\"{system_prompt}\"\"\"
-PARAMETER temperature {params['temperature']}
-PARAMETER top_p {params['top_p']}
-PARAMETER top_k {params['top_k']}
-PARAMETER num_ctx {params['num_ctx']}
-PARAMETER repeat_penalty {params['repeat_penalty']}
-PARAMETER num_predict {predict_tokens}
-PARAMETER num_thread {boost_params['num_thread']}
-PARAMETER num_gpu {boost_params['num_gpu']}
-PARAMETER num_batch {boost_params['num_batch']}
-"""
-    
-    timestamp = int(time.time())
-    size_suffix = "tiny" if config['optimization'] == 5 else "mobile" if config['optimization'] == 6 else "optimized"
-    filename = f"Modelfile-{task.replace(' ', '-')}-{size_suffix}-{timestamp}"
-    
-    with open(filename, "w", encoding='utf-8') as f:
-        f.write(modelfile_content)
     
-    return filename
+    return _MODELFILE_TEMPLATE.substitute(
+        params,
+        base_model=base_model,
+        template=_OLLAMA_TEMPLATE,
+        system_prompt=system_prompt
+    )
+
+def _first_token_ping(model_name, timeout=15):
+    """Check that a model loads and answers, stopping at its first token"""
+    payload = {"model": model_name, "prompt": "hi", "stream": True, "options": {"num_predict": 1}}
+    chunks = _api_stream("/api/generate", payload, timeout)
+    try:
+        first = next(chunks, None)
+    finally:
+        chunks.close()
+    return first is not None and 'error' not in first
 
 def create_ultimate_model(task, base_model, config):
     """Create the ultimate specialized model with maximum efficiency"""
+    import subprocess
     try:
         safe_print(f"🔥 Creating APEX model for {task}...", Colors.OKCYAN)
         
-        modelfile_path = create_ultimate_modelfile(task, base_model, config)
+        modelfile_content = create_ultimate_modelfile(task, base_model, config)
         
         # Create optimized model name based on size
-        clean_task = ''.join(c for c in task if c.isalnum() or c in ' -_').strip()
-        
-        if config['optimization'] == 5:  # Tiny specialist
-            model_name = f"{clean_task.replace(' ', '_').replace('-', '_').lower()}_tiny"
-            safe_print("🐁 Creating TINY specialist model...", Colors.WARNING)
-        elif config['optimization'] == 6:  # Mobile optimized
-            model_name = f"{clean_task.replace(' ', '_').replace('-', '_').lower()}_mobile"
-            safe_print("📱 Creating MOBILE optimized model...", Colors.WARNING)
-        else:
-            model_name = f"{clean_task.replace(' ', '_').replace('-', '_').lower()}_apex"
-            safe_print("⚡ Compiling model with APEX optimizations...", Colors.WARNING)
+        suffix, banner = _MODEL_VARIANTS.get(config['optimization'], _DEFAULT_MODEL_VARIANT)
+        model_name = f"{slugify(task)}_{suffix}"
+        safe_print(banner, Colors.WARNING)
         safe_print("🚀 Applying maximum performance parameters...", Colors.OKCYAN)
         
         # Create the model with enhanced error handling
         creation_start = time.time()
-        result = subprocess.run(
-            [find_ollama_command(), "create", model_name, "-f", modelfile_path],
-            check=True, capture_output=True, text=True
-        )
+        with tempfile.TemporaryDirectory(prefix="ollama-specgen-") as workdir:
+            modelfile_path = os.path.join(workdir, f"Modelfile-{model_name}")
+            with open(modelfile_path, "w", encoding='utf-8') as f:
+                f.write(modelfile_content)
+            subprocess.run(
+                [find_ollama_command(), "create", model_name, "-f", modelfile_path],
+                check=True, capture_output=True, text=True
+            )
         creation_time = time.time() - creation_start
         
         safe_print(f"✓ Successfully created: {model_name} (in {creation_time:.1f}s)", Colors.OKGREEN)
@@ -583,13 +924,16 @@ def create_ultimate_model(task, base_model, config):
         # Enhanced model testing
         safe_print("🧪 Testing APEX model performance...", Colors.OKCYAN)
         test_start = time.time()
-        test_result = subprocess.run(
-            [find_ollama_command(), "run", model_name, "Hello, introduce yourself briefly and show your capabilities."],
-            capture_output=True, text=True, timeout=15
-        )
+        try:
+            test_ok = _first_token_ping(model_name)
+        except socket.timeout:
+            safe_print("⚠ Model created but test timed out", Colors.WARNING)
+            return model_name
+        except (OSError, ValueError):
+            test_ok = False
         test_time = time.time() - test_start
         
-        if test_result.returncode == 0:
+        if test_ok:
             safe_print(f"✓ APEX model test successful! (Response time: {test_time:.1f}s)", Colors.OKGREEN)
             safe_print(f"🎯 Model is ready for maximum performance operations", Colors.OKGREEN)
         else:
@@ -600,20 +944,53 @@ def create_ultimate_model(task, base_model, config):
     except subprocess.CalledProcessError as e:
         safe_print(f"✗ Failed to create APEX model: {e.stderr}", Colors.FAIL)
         return None
-    except subprocess.TimeoutExpired:
-        safe_print("⚠ Model created but test timed out", Colors.WARNING)
-        return model_name
-    finally:
-        # Enhanced cleanup
-        if 'modelfile_path' in locals() and os.path.exists(modelfile_path):
-            os.remove(modelfile_path)
-            safe_print("🧹 Cleaned up temporary files", Colors.OKCYAN)
 
-def launch_interactive_session(model_name, task):
-    """Launch an interactive session with the newly created model"""
+def stream_generate(model_name, prompt, timeout=120, options=None, deadline=None):
+    """Stream a completion to stdout as tokens arrive; returns True when done
+    
+    The model keeps Ollama's default keep-alive, so a following `ollama run`
+    finds it loaded without pinning it indefinitely. With a deadline
+    (seconds), the stream is cut off once it runs that long, keeping what
+    was printed.
+    """
+    payload = {"model": model_name, "prompt": prompt, "stream": True}
+    if options:
+        payload["options"] = options
+    if deadline is not None:
+        timeout = min(timeout, deadline)
+        expires = time.monotonic() + deadline
+    with contextlib.closing(_api_stream("/api/generate", payload, timeout)) as stream:
+        for chunk in stream:
+            if 'error' in chunk:
+                safe_print(f"\n✗ {chunk['error']}", Colors.FAIL)
+                return False
+            done = chunk.get('done', False)
+            with print_lock:
+                sys.stdout.write(chunk.get('response', '') + ("\n" if done else ""))
+                sys.stdout.flush()
+            if done:
+                return True
+            if deadline is not None and time.monotonic() >= expires:
+                safe_print(f"\n… stopped after {deadline:.0f}s", Colors.WARNING)
+                return False
+    return False
+
+def unload_model(model_name):
+    """Ask Ollama to release the model's memory right away"""
+    try:
+        for _ in _api_stream("/api/generate", {"model": model_name, "keep_alive": 0}, timeout=10):
+            pass
+    except (OSError, ValueError):
+        pass
+
+# Wall-clock budget for the opening overview before handing off to the chat
+_OVERVIEW_DEADLINE = 120
+
+def launch_interactive_session(model_name, task, options=None):
+    """Stream an overview from the new model, then hand the terminal to ollama run"""
     safe_print(f"\n{Colors.HEADER}🚀 LAUNCHING INTERACTIVE SESSION 🚀{Colors.ENDC}")
     safe_print(f"Starting conversation with your {task} specialist...")
-    safe_print(f"Type 'exit' or 'quit' to end the session\n")
+    safe_print(f"Type /bye to end the session\n")
     
     # Initial comprehensive prompt to showcase capabilities
     initial_prompt = f"Hello! I'm your {task} specialist. Let me demonstrate my comprehensive expertise by providing you with a complete overview of {task} from beginner to advanced levels. I'll cover all essential aspects, methodologies, tools, best practices, and advanced techniques. Please share everything you know about this field in detail."
@@ -621,103 +998,112 @@ def launch_interactive_session(model_name, task):
     try:
         # Start with comprehensive overview
         safe_print(f"{Colors.OKCYAN}🤖 Starting comprehensive overview...{Colors.ENDC}\n")
-        result = subprocess.run(
-            [find_ollama_command(), "run", model_name, initial_prompt],
-            text=True, timeout=120
-        )
-        
-        if result.returncode == 0:
+        if stream_generate(model_name, initial_prompt, options=options, deadline=_OVERVIEW_DEADLINE):
             safe_print(f"\n{Colors.OKGREEN}✓ Overview completed! Now entering interactive mode...{Colors.ENDC}")
-        
-        # Interactive session
-        safe_print(f"\n{Colors.HEADER}💬 INTERACTIVE MODE - Ask anything about {task}!{Colors.ENDC}")
-        safe_print("─" * 60)
-        
-        while True:
-            try:
-                user_input = input(f"\n{Colors.BOLD}You: {Colors.ENDC}")
-                
-                if user_input.lower() in ['exit', 'quit', 'bye']:
-                    safe_print(f"\n{Colors.OKCYAN}👋 Session ended. Your {task} specialist is ready for future use!{Colors.ENDC}")
-                    break
-                
-                if user_input.strip():
-                    safe_print(f"\n{Colors.OKCYAN}🤖 {model_name}:{Colors.ENDC}")
-                    subprocess.run([find_ollama_command(), "run", model_name, user_input])
-                    
-            except KeyboardInterrupt:
-                safe_print(f"\n\n{Colors.WARNING}Session interrupted. Your model is ready for use!{Colors.ENDC}")
-                break
-                
-    except subprocess.TimeoutExpired:
+    except socket.timeout:
         safe_print(f"{Colors.WARNING}Initial overview timed out, but your model is ready!{Colors.ENDC}")
-    except Exception as e:
-        safe_print(f"{Colors.FAIL}Error in interactive session: {e}{Colors.ENDC}")
+    except (OSError, ValueError) as e:
+        # The chat goes through the CLI, so an API failure here should not block it
+        safe_print(f"{Colors.WARNING}Overview unavailable ({e}), but your model is ready!{Colors.ENDC}")
+    except BaseException:
+        # Ctrl-C or an unexpected error: free the model before main reports it
+        unload_model(model_name)
+        raise
+    
+    # Interactive session runs in ollama itself; nothing follows it here
+    safe_print(f"\n{Colors.HEADER}💬 INTERACTIVE MODE - Ask anything about {task}!{Colors.ENDC}")
+    safe_print("─" * 60)
+    sys.stdout.flush()
+    
+    ollama_cmd = find_ollama_command()
+    if sys.platform != "win32":
+        try:
+            os.execvp(ollama_cmd, [ollama_cmd, "run", model_name])
+        except OSError as e:
+            safe_print(f"{Colors.FAIL}Could not start ollama run: {e}{Colors.ENDC}")
+            unload_model(model_name)
+        return
+    
+    import subprocess
+    try:
+        subprocess.run([ollama_cmd, "run", model_name])
+    except KeyboardInterrupt:
+        safe_print(f"\n\n{Colors.WARNING}Session interrupted. Your model is ready for use!{Colors.ENDC}")
+    finally:
+        unload_model(model_name)
+
+# Success-screen line per enabled feature; {task} is filled in at display time
+_FEATURE_LINES = (
+    ('code_focus', "  ✓ Advanced code generation optimization enabled"),
+    ('math_focus', "  ✓ Mathematical computation enhancement enabled"),
+    ('creative_boost', "  ✓ Creative thinking enhancement enabled"),
+    ('memory_optimization', "  ✓ Conversation memory optimization enabled"),
+    ('maximum_capability', "  ✓ Maximum capability mode enabled for {task}"),
+    ('creative_solutions', "  ✓ Creative problem-solving enabled"),
+    ('decision_framework', "  ✓ Advanced decision-making frameworks enabled"),
+    ('strict_task_mode', "  ✓ Strict task specialization enforced")
+)
 
 def display_success_info(model_name, task, config):
     """Display success information and usage instructions"""
-    safe_print(f"\n{Colors.HEADER}{'='*60}{Colors.ENDC}")
-    safe_print(f"{Colors.OKGREEN}🎉 ULTIMATE MODEL CREATED SUCCESSFULLY! 🎉{Colors.ENDC}")
-    safe_print(f"{Colors.HEADER}{'='*60}{Colors.ENDC}")
-    
-    safe_print(f"\n{Colors.BOLD}Model Details:{Colors.ENDC}")
-    safe_print(f"  📝 Name: {Colors.OKCYAN}{model_name}{Colors.ENDC}")
-    safe_print(f"  🎯 Task: {Colors.OKCYAN}{task}{Colors.ENDC}")
-    safe_print(f"  🏆 Level: {Colors.OKCYAN}{config['level']}/6{Colors.ENDC}")
-    safe_print(f"  ⚡ Style: {Colors.OKCYAN}{config['style']}/5{Colors.ENDC}")
-    
-    safe_print(f"\n{Colors.BOLD}Usage Instructions:{Colors.ENDC}")
-    safe_print(f"  🚀 Run: {Colors.OKGREEN}ollama run {model_name}{Colors.ENDC}")
-    safe_print(f"  🔧 Chat: {Colors.OKGREEN}ollama run {model_name} \"Your question here\"{Colors.ENDC}")
-    safe_print(f"  📋 List: {Colors.OKGREEN}ollama list{Colors.ENDC}")
-    safe_print(f"  🗑️  Remove: {Colors.OKGREEN}ollama rm {model_name}{Colors.ENDC}")
-    
-    safe_print(f"\n{Colors.BOLD}Performance Features:{Colors.ENDC}")
-    features = config['features']
-    if features['code_focus']:
-        safe_print("  ✓ Advanced code generation optimization enabled")
-    if features['math_focus']:
-        safe_print("  ✓ Mathematical computation enhancement enabled")
-    if features['creative_boost']:
-        safe_print("  ✓ Creative thinking enhancement enabled")
-    if features['memory_optimization']:
-        safe_print("  ✓ Conversation memory optimization enabled")
-    if features['maximum_capability']:
-        safe_print(f"  ✓ Maximum capability mode enabled for {task}")
-    if features['creative_solutions']:
-        safe_print(f"  ✓ Creative problem-solving enabled")
-    if features['decision_framework']:
-        safe_print(f"  ✓ Advanced decision-making frameworks enabled")
-    if features['strict_task_mode']:
-        safe_print(f"  ✓ Strict task specialization enforced")
-    
-    safe_print(f"\n{Colors.OKGREEN}Your ultimate {task} specialist is ready to deliver maximum capability and creative solutions!{Colors.ENDC}")
+    with _BufferedPrinter():
+        safe_print(f"\n{Colors.HEADER}{'='*60}{Colors.ENDC}")
+        safe_print(f"{Colors.OKGREEN}🎉 ULTIMATE MODEL CREATED SUCCESSFULLY! 🎉{Colors.ENDC}")
+        safe_print(f"{Colors.HEADER}{'='*60}{Colors.ENDC}")
+        
+        safe_print(f"\n{Colors.BOLD}Model Details:{Colors.ENDC}")
+        safe_print(f"  📝 Name: {Colors.OKCYAN}{model_name}{Colors.ENDC}")
+        safe_print(f"  🎯 Task: {Colors.OKCYAN}{task}{Colors.ENDC}")
+        safe_print(f"  🏆 Level: {Colors.OKCYAN}{config['level']}/6{Colors.ENDC}")
+        safe_print(f"  ⚡ Style: {Colors.OKCYAN}{config['style']}/5{Colors.ENDC}")
+        
+        safe_print(f"\n{Colors.BOLD}Usage Instructions:{Colors.ENDC}")
+        safe_print(f"  🚀 Run: {Colors.OKGREEN}ollama run {model_name}{Colors.ENDC}")
+        safe_print(f"  🔧 Chat: {Colors.OKGREEN}ollama run {model_name} \"Your question here\"{Colors.ENDC}")
+        safe_print(f"  📋 List: {Colors.OKGREEN}ollama list{Colors.ENDC}")
+        safe_print(f"  🗑️  Remove: {Colors.OKGREEN}ollama rm {model_name}{Colors.ENDC}")
+        
+        safe_print(f"\n{Colors.BOLD}Performance Features:{Colors.ENDC}")
+        features = config['features']
+        for key, line in _FEATURE_LINES:
+            if features[key]:
+                safe_print(line.format(task=task))
+        
+        safe_print(f"\n{Colors.OKGREEN}Your ultimate {task} specialist is ready to deliver maximum capability and creative solutions!{Colors.ENDC}")
+        
+        # Ask if user wants to start interactive session
+        safe_print(f"\n{Colors.HEADER}🎯 INSTANT DEMO AVAILABLE{Colors.ENDC}")
     
-    # Ask if user wants to start interactive session
-    safe_print(f"\n{Colors.HEADER}🎯 INSTANT DEMO AVAILABLE{Colors.ENDC}")
     start_session = input(f"{Colors.BOLD}Start interactive session to see full capabilities? (y/n): {Colors.ENDC}")
     
     if start_session.lower().startswith('y'):
-        launch_interactive_session(model_name, task)
+        options = {"num_thread": _OPT_CONFIG.get(config['optimization'], _OPT_CONFIG[2])['num_thread']}
+        launch_interactive_session(model_name, task, options)
     else:
         safe_print(f"\n{Colors.OKCYAN}Model ready! Use: ollama run {model_name}{Colors.ENDC}")
 
 def main():
     """Main execution function"""
-    safe_print(f"{Colors.HEADER}{'='*60}{Colors.ENDC}")
-    safe_print(f"{Colors.HEADER}🚀 ULTIMATE OLLAMA MODEL SPECIALIZATION GENERATOR 🚀{Colors.ENDC}")
-    safe_print(f"{Colors.HEADER}{'='*60}{Colors.ENDC}")
-    safe_print(f"{Colors.OKCYAN}Creating the world's fastest, most specialized AI models{Colors.ENDC}")
+    parser = argparse.ArgumentParser(description="Ultimate Ollama Model Specialization Generator")
+    parser.add_argument("--max-parallel-pulls", type=int, default=2, metavar="N",
+                        help="number of models to download concurrently (default: 2)")
+    args = parser.parse_args()
+    
+    with _BufferedPrinter():
+        safe_print(f"{Colors.HEADER}{'='*60}{Colors.ENDC}")
+        safe_print(f"{Colors.HEADER}🚀 ULTIMATE OLLAMA MODEL SPECIALIZATION GENERATOR 🚀{Colors.ENDC}")
+        safe_print(f"{Colors.HEADER}{'='*60}{Colors.ENDC}")
+        safe_print(f"{Colors.OKCYAN}Creating the world's fastest, most specialized AI models{Colors.ENDC}")
     
     # Check prerequisites
     if not check_ollama_installation():
         sys.exit(1)
     
     # Suggest tiny models if user wants minimal size
-    suggest_tiny_models()
+    suggest_tiny_models(args.max_parallel_pulls)
     
     # Get configuration
-    base_model = select_base_model()
+    base_model = select_base_model(args.max_parallel_pulls)
     config = get_advanced_config()
     
     # Create the ultimate model